@@ -10,7 +10,7 @@ from homeassistant.exceptions import ConfigEntryNotReady
 from homeassistant.helpers import llm
 
 from .const import DOMAIN
-from .coordinator import MCPGatewayCoordinator
+from .coordinator import MCPGatewayCoordinator, tools_store
 from .llm_api import MCPToolsAPI
 
 _LOGGER = logging.getLogger(__name__)
@@ -26,20 +26,27 @@ async def async_setup_entry(hass: HomeAssistant, entry: MCPClientConfigEntry) ->
 
     entry.runtime_data = coordinator
 
-    try:
-        await coordinator.async_config_entry_first_refresh()
-    except ConfigEntryNotReady:
-        await coordinator.async_disconnect()
-        raise
+    if coordinator.tools_loaded_from_cache:
+        # Serve the cached catalog right away and connect in the background
+        entry.async_create_background_task(
+            hass, coordinator.async_refresh(), f"{DOMAIN} refresh {entry.entry_id}"
+        )
+    else:
+        try:
+            await coordinator.async_config_entry_first_refresh()
+        except ConfigEntryNotReady:
+            await coordinator.async_disconnect()
+            raise
 
     api = MCPToolsAPI(hass, entry, coordinator)
     unreg = llm.async_register_api(hass, api)
     entry.async_on_unload(unreg)
 
     _LOGGER.info(
-        "MCP Client connected to %s — %d tools registered",
+        "MCP Client set up for %s — %d tools registered%s",
         entry.data["gateway_url"],
         len(coordinator.tools),
+        " from cache" if coordinator.tools_loaded_from_cache else "",
     )
 
     return True
@@ -49,3 +56,8 @@ async def async_unload_entry(hass: HomeAssistant, entry: MCPClientConfigEntry) -
     """Unload MCP Client config entry."""
     await entry.runtime_data.async_disconnect()
     return True
+
+
+async def async_remove_entry(hass: HomeAssistant, entry: MCPClientConfigEntry) -> None:
+    """Remove the cached tool catalog of a deleted config entry."""
+    await tools_store(hass, entry.entry_id).async_remove()
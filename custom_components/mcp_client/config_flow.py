@@ -16,6 +16,7 @@ from homeassistant.config_entries import (
     OptionsFlow,
 )
 from homeassistant.core import callback
+from homeassistant.helpers.aiohttp_client import async_get_clientsession
 from homeassistant.helpers.selector import (
     SelectOptionDict,
     SelectSelector,
@@ -26,9 +27,11 @@ from homeassistant.helpers.selector import (
 from .const import (
     CONF_ALLOWED_TOOLS,
     CONF_AUTH_TOKEN,
+    CONF_BATCH_WINDOW,
     CONF_GATEWAY_URL,
     CONF_TIMEOUT_CONNECTION,
     CONF_TIMEOUT_EXECUTION,
+    DEFAULT_BATCH_WINDOW,
     DEFAULT_TIMEOUT_CONNECTION,
     DEFAULT_TIMEOUT_EXECUTION,
     DOMAIN,
@@ -85,6 +88,8 @@ class MCPClientConfigFlow(ConfigFlow, domain=DOMAIN):
             transport = StreamableHTTPTransport(
                 url=self._gateway_url,
                 auth_token=self._auth_token or None,
+                timeout_connection=DEFAULT_TIMEOUT_CONNECTION,
+                session=async_get_clientsession(self.hass),
             )
             try:
                 await transport.connect()
@@ -138,6 +143,7 @@ class MCPClientConfigFlow(ConfigFlow, domain=DOMAIN):
                     CONF_ALLOWED_TOOLS: selected_tools,
                     CONF_TIMEOUT_CONNECTION: DEFAULT_TIMEOUT_CONNECTION,
                     CONF_TIMEOUT_EXECUTION: DEFAULT_TIMEOUT_EXECUTION,
+                    CONF_BATCH_WINDOW: DEFAULT_BATCH_WINDOW,
                 },
             )
 
@@ -197,6 +203,12 @@ class MCPClientOptionsFlow(OptionsFlow):
                             CONF_TIMEOUT_EXECUTION, DEFAULT_TIMEOUT_EXECUTION
                         ),
                     ): vol.All(int, vol.Range(min=10, max=120)),
+                    vol.Optional(
+                        CONF_BATCH_WINDOW,
+                        default=self.config_entry.options.get(
+                            CONF_BATCH_WINDOW, DEFAULT_BATCH_WINDOW
+                        ),
+                    ): vol.All(int, vol.Range(min=0, max=50)),
                 }
             ),
         )
@@ -5,6 +5,7 @@ DOMAIN = "mcp_client"
 CONF_GATEWAY_URL = "gateway_url"
 CONF_AUTH_TOKEN = "auth_token"
 CONF_ALLOWED_TOOLS = "allowed_tools"
+CONF_BATCH_WINDOW = "batch_window_ms"
 CONF_BLOCKED_TOOLS = "blocked_tools"
 CONF_TIMEOUT_CONNECTION = "timeout_connection"
 CONF_TIMEOUT_EXECUTION = "timeout_execution"
@@ -12,9 +13,13 @@ CONF_TLS_MODE = "tls_mode"
 
 DEFAULT_TIMEOUT_CONNECTION = 10
 DEFAULT_TIMEOUT_EXECUTION = 60
+DEFAULT_BATCH_WINDOW = 0
 
 MCP_PROTOCOL_VERSION = "2024-11-05"
 MCP_CLIENT_VERSION = "1.0.1"
 
+STORAGE_VERSION = 1
+STORAGE_KEY_TOOLS = f"{DOMAIN}.{{entry_id}}.tools"
+
 TLS_HTTP_TRUSTED = "http_trusted"
 TLS_VERIFY_FULL = "verify_full"
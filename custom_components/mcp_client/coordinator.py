@@ -2,28 +2,62 @@
 
 from __future__ import annotations
 
+import asyncio
+import hashlib
 import logging
+import random
+import sys
+from collections.abc import Awaitable, Callable
 from datetime import timedelta
+from typing import Any
 
-from homeassistant.core import HomeAssistant
+import aiohttp
+
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import HomeAssistant, callback
 from homeassistant.exceptions import HomeAssistantError
 from homeassistant.helpers.aiohttp_client import async_get_clientsession
+from homeassistant.helpers.json import json_bytes_sorted
+from homeassistant.helpers.storage import Store
 from homeassistant.helpers.update_coordinator import DataUpdateCoordinator, UpdateFailed
 
 from .const import (
     CONF_ALLOWED_TOOLS,
     CONF_AUTH_TOKEN,
+    CONF_BATCH_WINDOW,
     CONF_GATEWAY_URL,
     CONF_TIMEOUT_CONNECTION,
     CONF_TIMEOUT_EXECUTION,
+    DEFAULT_BATCH_WINDOW,
     DEFAULT_TIMEOUT_CONNECTION,
     DEFAULT_TIMEOUT_EXECUTION,
     DOMAIN,
+    MCP_CLIENT_VERSION,
+    MCP_PROTOCOL_VERSION,
+    STORAGE_KEY_TOOLS,
+    STORAGE_VERSION,
 )
 from .transport import StreamableHTTPTransport
 
 _LOGGER = logging.getLogger(__name__)
 
+TOOLS_SAVE_DELAY = 10
+
+RETRY_ATTEMPTS = 3
+RETRY_BACKOFF_BASE = 1.0
+RETRY_BACKOFF_MAX = 30.0
+RETRY_JITTER = 0.5
+
+
+def tools_store(hass: HomeAssistant, entry_id: str) -> Store[dict[str, Any]]:
+    """Return the store holding the cached tool catalog for an entry."""
+    return Store(hass, STORAGE_VERSION, STORAGE_KEY_TOOLS.format(entry_id=entry_id))
+
+
+def _allowed_tool_names(entry: ConfigEntry) -> frozenset[str]:
+    """Return the interned names of the tools enabled in the options."""
+    return frozenset(map(sys.intern, entry.options.get(CONF_ALLOWED_TOOLS, [])))
+
 
 class MCPGatewayCoordinator(DataUpdateCoordinator[None]):
     """Coordinator for MCP Gateway connection and tool management."""
@@ -38,28 +72,164 @@ class MCPGatewayCoordinator(DataUpdateCoordinator[None]):
         )
         self._entry = entry
         self._transport: StreamableHTTPTransport | None = None
+        self._connect_lock = asyncio.Lock()
+        self._available_tools: list[dict] = []
         self._tools: list[dict] = []
+        self._tool_names: frozenset[str] = frozenset()
+        self._catalog_hash: int | None = None
+        self._tools_loaded_from_cache = False
         self._gateway_url = entry.data[CONF_GATEWAY_URL]
         self._auth_token = entry.data.get(CONF_AUTH_TOKEN, "")
+        self._allowed_tools = _allowed_tool_names(entry)
+        self._timeout_connection: int = entry.options.get(
+            CONF_TIMEOUT_CONNECTION, DEFAULT_TIMEOUT_CONNECTION
+        )
+        self._timeout_execution: int = entry.options.get(
+            CONF_TIMEOUT_EXECUTION, DEFAULT_TIMEOUT_EXECUTION
+        )
+        self._batch_window: int = entry.options.get(
+            CONF_BATCH_WINDOW, DEFAULT_BATCH_WINDOW
+        )
+        self._store = tools_store(hass, entry.entry_id)
+        self._save_pending = False
+        self._cache_key = self._build_cache_key()
+
+    def _build_cache_key(self) -> str:
+        """Build the key identifying the gateway a cached catalog belongs to."""
+        token_hash = hashlib.sha256(self._auth_token.encode()).hexdigest()
+        return hashlib.sha256(
+            "|".join(
+                (
+                    self._gateway_url,
+                    token_hash,
+                    MCP_PROTOCOL_VERSION,
+                    MCP_CLIENT_VERSION,
+                )
+            ).encode()
+        ).hexdigest()
 
     async def async_setup(self) -> None:
-        """Set up the coordinator and connect to the gateway."""
+        """Set up the coordinator.
+
+        The MCP session is opened by the first refresh or tool call, so a
+        warm cache keeps the gateway handshake off the startup path.
+        """
+        await self._async_load_cached_tools()
+        self._entry.async_on_unload(
+            self._entry.add_update_listener(self._async_options_updated)
+        )
+
         session = async_get_clientsession(self.hass)
         self._transport = StreamableHTTPTransport(
             url=self._gateway_url,
             auth_token=self._auth_token or None,
-            timeout_connection=self._entry.options.get(
-                CONF_TIMEOUT_CONNECTION, DEFAULT_TIMEOUT_CONNECTION
-            ),
-            timeout_execution=self._entry.options.get(
-                CONF_TIMEOUT_EXECUTION, DEFAULT_TIMEOUT_EXECUTION
-            ),
+            timeout_connection=self._timeout_connection,
+            timeout_execution=self._timeout_execution,
+            batch_window=self._batch_window / 1000,
             session=session,
         )
-        await self._transport.connect()
+
+    async def _async_ensure_connected(self) -> StreamableHTTPTransport:
+        """Return the transport, opening the MCP session if needed."""
+        if not self._transport:
+            raise HomeAssistantError("Transport not initialized")
+        if not self._transport.connected:
+            async with self._connect_lock:
+                if not self._transport.connected:
+                    await self._transport.connect()
+        return self._transport
+
+    async def _async_retry[_T](
+        self,
+        fn: Callable[..., Awaitable[_T]],
+        *args: Any,
+        recoverable_exc: tuple[type[Exception], ...] = (
+            aiohttp.ClientConnectionError,
+            TimeoutError,
+        ),
+        retry_read_timeouts: bool = True,
+    ) -> _T:
+        """Await fn, retrying transient failures with exponential backoff.
+
+        HTTP 5xx responses are retried as well; any other HTTP error (such
+        as 400 or 401) is raised straight away. aiohttp read timeouts are
+        ClientConnectionErrors too, so retry_read_timeouts decides them
+        separately; timeouts while connecting are always recoverable.
+        """
+        attempt = 0
+        while True:
+            try:
+                return await fn(*args)
+            except Exception as err:
+                if isinstance(err, aiohttp.ClientResponseError):
+                    recoverable = err.status >= 500
+                elif isinstance(err, aiohttp.ServerTimeoutError) and not isinstance(
+                    err, aiohttp.ConnectionTimeoutError
+                ):
+                    recoverable = retry_read_timeouts
+                else:
+                    recoverable = isinstance(err, recoverable_exc)
+                if not recoverable or attempt >= RETRY_ATTEMPTS:
+                    raise
+                delay = min(
+                    RETRY_BACKOFF_MAX,
+                    RETRY_BACKOFF_BASE
+                    * (2**attempt)
+                    * (1 + random.random() * RETRY_JITTER),
+                )
+                attempt += 1
+                _LOGGER.debug(
+                    "Gateway request failed (%s), retry %d in %.1fs",
+                    err,
+                    attempt,
+                    delay,
+                )
+                await asyncio.sleep(delay)
+
+    async def _async_load_cached_tools(self) -> None:
+        """Serve the last known tool catalog until the gateway is refreshed."""
+        cached = await self._store.async_load()
+        if not cached:
+            return
+        if cached.get("key") != self._cache_key:
+            _LOGGER.debug("Ignoring stale tool cache for %s", self._gateway_url)
+            return
+        self._set_available_tools(cached["tools"])
+        self._tools_loaded_from_cache = True
+
+    async def _async_options_updated(
+        self, hass: HomeAssistant, entry: ConfigEntry
+    ) -> None:
+        """Apply updated options to the tool catalog and transport."""
+        self._allowed_tools = _allowed_tool_names(entry)
+        self._apply_tool_filter()
+        self._timeout_connection = entry.options.get(
+            CONF_TIMEOUT_CONNECTION, DEFAULT_TIMEOUT_CONNECTION
+        )
+        self._timeout_execution = entry.options.get(
+            CONF_TIMEOUT_EXECUTION, DEFAULT_TIMEOUT_EXECUTION
+        )
+        self._batch_window = entry.options.get(CONF_BATCH_WINDOW, DEFAULT_BATCH_WINDOW)
+        if self._transport:
+            self._transport.set_timeouts(
+                self._timeout_connection, self._timeout_execution
+            )
+            self._transport.set_batch_window(self._batch_window / 1000)
+
+    @callback
+    def _data_to_store(self) -> dict[str, Any]:
+        """Return the tool catalog to persist."""
+        self._save_pending = False
+        return {"key": self._cache_key, "tools": self._available_tools}
 
     async def async_disconnect(self) -> None:
-        """Disconnect from the gateway."""
+        """Disconnect from the gateway and flush any pending cache write.
+
+        The write is flushed through this coordinator's store so that removing
+        the entry right after a refresh cannot have it re-created later.
+        """
+        if self._save_pending:
+            await self._store.async_save(self._data_to_store())
         if self._transport:
             await self._transport.disconnect()
 
@@ -68,29 +238,73 @@ class MCPGatewayCoordinator(DataUpdateCoordinator[None]):
         if not self._transport:
             raise UpdateFailed("Transport not initialized")
         try:
-            tools = await self._transport.list_tools()
-            self._tools = self._filter_tools(tools)
+            transport = await self._async_ensure_connected()
+            tools = await self._async_retry(transport.list_tools)
         except Exception as err:
             raise UpdateFailed(f"Failed to update gateway data: {err}") from err
 
+        if self._set_available_tools(tools):
+            self._save_pending = True
+            self._store.async_delay_save(self._data_to_store, TOOLS_SAVE_DELAY)
+
+    def _set_available_tools(self, tools: list[dict]) -> bool:
+        """Replace the tool catalog, returning False if it is unchanged.
+
+        The filtered list is only replaced when the catalog changes, so
+        consumers can tell from its identity whether to rebuild anything
+        derived from it.
+        """
+        catalog_hash = hash(json_bytes_sorted(tools))
+        if catalog_hash == self._catalog_hash:
+            return False
+        self._catalog_hash = catalog_hash
+        for tool in tools:
+            tool["name"] = sys.intern(tool["name"])
+        self._available_tools = tools
+        self._apply_tool_filter()
+        return True
+
+    def _apply_tool_filter(self) -> None:
+        """Rebuild the exposed tool list from the catalog and options."""
+        self._tools = self._filter_tools(self._available_tools)
+        self._tool_names = frozenset(t["name"] for t in self._tools)
+
     def _filter_tools(self, tools: list[dict]) -> list[dict]:
         """Filter tools based on configuration."""
-        allowed = self._entry.options.get(CONF_ALLOWED_TOOLS, [])
-        if not allowed:
+        if not self._allowed_tools:
             return tools
-        return [t for t in tools if t["name"] in allowed]
+        return [t for t in tools if t["name"] in self._allowed_tools]
 
     @property
     def tools(self) -> list[dict]:
         """Return the list of available tools."""
         return self._tools
 
+    @property
+    def tools_loaded_from_cache(self) -> bool:
+        """Return True if setup restored the tool catalog from storage."""
+        return self._tools_loaded_from_cache
+
     async def async_call_tool(self, tool_name: str, arguments: dict) -> dict:
         """Call an MCP tool via the gateway."""
-        if not self._transport:
-            raise HomeAssistantError("Transport not initialized")
+        if tool_name not in self._tool_names:
+            raise HomeAssistantError(f"Unknown or disallowed MCP tool: {tool_name}")
         try:
-            return await self._transport.call_tool(tool_name, arguments)
+            transport = await self._async_ensure_connected()
+            # A dropped or timed out call may still be running on the gateway,
+            # so tool calls are only retried when the request never left the
+            # client. Stale keep-alive connections are re-sent once by the
+            # transport itself.
+            return await self._async_retry(
+                transport.call_tool,
+                tool_name,
+                arguments,
+                recoverable_exc=(
+                    aiohttp.ClientConnectorError,
+                    aiohttp.ConnectionTimeoutError,
+                ),
+                retry_read_timeouts=False,
+            )
         except HomeAssistantError:
             raise
         except Exception as err:
@@ -11,6 +11,7 @@ from homeassistant.config_entries import ConfigEntry
 from homeassistant.core import HomeAssistant
 from homeassistant.exceptions import HomeAssistantError
 from homeassistant.helpers import llm
+from homeassistant.helpers.json import json_bytes_sorted
 from homeassistant.util.json import JsonObjectType
 
 from .const import DOMAIN
@@ -18,10 +19,28 @@ from .coordinator import MCPGatewayCoordinator
 
 _LOGGER = logging.getLogger(__name__)
 
+_JSON_TYPE_MAP: dict[str, type] = {
+    "string": str,
+    "integer": int,
+    "number": float,
+    "boolean": bool,
+    "array": list,
+    "object": dict,
+}
+
+_SCHEMA_CACHE_SIZE = 256
+_SCHEMA_CACHE: dict[bytes, vol.Schema] = {}
+
 
 class MCPToolsAPI(llm.API):
     """Expose Docker MCP Gateway tools to HA conversation agents."""
 
+    _API_PROMPT = (
+        "You have access to external tools provided by an MCP server. "
+        "Use these tools when the user's request matches their purpose. "
+        "Tool results should be incorporated into your natural language response."
+    )
+
     def __init__(
         self,
         hass: HomeAssistant,
@@ -36,25 +55,26 @@ class MCPToolsAPI(llm.API):
         )
         self._entry = entry
         self._coordinator = coordinator
+        self._tool_schemas: list[dict] | None = None
+        self._tools: list[MCPTool] = []
 
     async def async_get_api_instance(
         self, llm_context: llm.LLMContext
     ) -> llm.APIInstance:
         """Return API instance with current MCP tools."""
-        tools = [
-            MCPTool(tool_schema, self._coordinator)
-            for tool_schema in self._coordinator.tools
-        ]
+        # The coordinator replaces its tool list only when the catalog changes
+        if self._coordinator.tools is not self._tool_schemas:
+            self._tool_schemas = self._coordinator.tools
+            self._tools = [
+                MCPTool(tool_schema, self._coordinator)
+                for tool_schema in self._tool_schemas
+            ]
 
         return llm.APIInstance(
             api=self,
-            api_prompt=(
-                "You have access to external tools provided by an MCP server. "
-                "Use these tools when the user's request matches their purpose. "
-                "Tool results should be incorporated into your natural language response."
-            ),
+            api_prompt=self._API_PROMPT,
             llm_context=llm_context,
-            tools=tools,
+            tools=self._tools,
         )
 
 
@@ -107,36 +127,34 @@ class MCPTool(llm.Tool):
 
     @staticmethod
     def _build_vol_schema(json_schema: dict) -> vol.Schema:
-        """Convert JSON Schema from MCP tool to voluptuous schema."""
+        """Return the voluptuous schema for an MCP tool's JSON Schema.
+
+        Conversions are cached by schema content, so tools rebuilt for every
+        LLM turn reuse the schema built the first time they were seen.
+        """
         if not json_schema or "properties" not in json_schema:
             return vol.Schema({})
 
+        key = json_bytes_sorted(json_schema)
+        if (schema := _SCHEMA_CACHE.get(key)) is None:
+            if len(_SCHEMA_CACHE) >= _SCHEMA_CACHE_SIZE:
+                _SCHEMA_CACHE.clear()
+            schema = _SCHEMA_CACHE[key] = MCPTool._convert_json_schema(json_schema)
+        return schema
+
+    @staticmethod
+    def _convert_json_schema(json_schema: dict) -> vol.Schema:
+        """Convert JSON Schema from MCP tool to voluptuous schema."""
         schema_dict = {}
         required = set(json_schema.get("required", []))
         properties = json_schema.get("properties", {})
 
         for prop_name, prop_def in properties.items():
-            python_type = {
-                "string": str,
-                "integer": int,
-                "number": float,
-                "boolean": bool,
-                "array": list,
-                "object": dict,
-            }.get(prop_def.get("type", "string"), str)
-
-            if prop_name in required:
-                key = vol.Required(prop_name)
-            else:
-                key = vol.Optional(prop_name)
-
-            if "description" in prop_def:
-                key = (
-                    vol.Required(prop_name, description=prop_def["description"])
-                    if prop_name in required
-                    else vol.Optional(prop_name, description=prop_def["description"])
-                )
-
-            schema_dict[key] = python_type
+            python_type = _JSON_TYPE_MAP.get(prop_def.get("type", "string"), str)
+
+            marker = vol.Required if prop_name in required else vol.Optional
+            schema_dict[
+                marker(prop_name, description=prop_def.get("description"))
+            ] = python_type
 
         return vol.Schema(schema_dict)
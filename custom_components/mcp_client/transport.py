@@ -2,48 +2,144 @@
 
 from __future__ import annotations
 
-import itertools
-import json
+import asyncio
+from collections.abc import AsyncIterator, Mapping
+from contextlib import aclosing
 import logging
+import re
+import time
+from typing import Any
 
 import aiohttp
 
+from homeassistant.helpers.json import json_bytes
+from homeassistant.util.json import JSON_DECODE_EXCEPTIONS, json_loads
+
 from .const import MCP_CLIENT_VERSION, MCP_PROTOCOL_VERSION
 
 _LOGGER = logging.getLogger(__name__)
 
+MAX_BATCH_SIZE = 20
+
+# Consecutive failed requests before short-circuiting, and for how long
+CIRCUIT_BREAKER_THRESHOLD = 5
+CIRCUIT_BREAKER_COOLDOWN = 10.0
+
+DEFAULT_TOOLS_CACHE_TTL = 30.0
+
+_SSE_EVENT_END = re.compile(rb"\r?\n\r?\n")
+
+# Constant request bodies, encoded once
+_INITIALIZED_BYTES = json_bytes(
+    {"jsonrpc": "2.0", "method": "notifications/initialized"}
+)
+_TOOLS_LIST_PREFIX = b'{"jsonrpc":"2.0","method":"tools/list","id":'
+_TOOLS_CALL_PREFIX = b'{"jsonrpc":"2.0","method":"tools/call","params":{"name":'
+
 
 class MCPTransportError(Exception):
     """Error raised when the MCP transport encounters a protocol-level failure."""
 
 
+def _sse_event_data(event: bytes | bytearray) -> bytes | None:
+    """Return the joined data lines of a raw SSE event, or None if it has none."""
+    data_lines = []
+    for line in event.splitlines():
+        if line.startswith(b"data:"):
+            value = line[5:]
+            data_lines.append(value[1:] if value.startswith(b" ") else value)
+    return b"\n".join(data_lines) if data_lines else None
+
+
+def _decode_json(data: bytes, source: str = "response") -> Any:
+    """Decode a JSON payload from the gateway."""
+    try:
+        return json_loads(data)
+    except JSON_DECODE_EXCEPTIONS as err:
+        raise MCPTransportError(f"Invalid JSON in {source}: {err}") from err
+
+
 class StreamableHTTPTransport:
     """Transport layer for MCP Gateway using Streamable HTTP."""
 
     def __init__(
         self,
         url: str,
+        *,
+        session: aiohttp.ClientSession,
         auth_token: str | None = None,
         timeout_connection: int = 30,
         timeout_execution: int = 60,
-        session: aiohttp.ClientSession | None = None,
+        batch_window: float = 0,
+        tools_cache_ttl: float = DEFAULT_TOOLS_CACHE_TTL,
     ) -> None:
-        """Initialize transport."""
+        """Initialize transport.
+
+        The session is owned by the caller (normally Home Assistant's shared
+        client session) and is never closed by the transport. A non-zero
+        batch_window (in seconds) coalesces tool calls made within that
+        window into one JSON-RPC batch. The tool list is reused for
+        tools_cache_ttl seconds (0 disables caching).
+        """
         self._url = url.rstrip("/")
-        self._auth_token = auth_token
-        self._timeout_connection = timeout_connection
-        self._timeout_execution = timeout_execution
-        self._external_session = session
-        self._session: aiohttp.ClientSession | None = None
+        self._headers = {
+            "Content-Type": "application/json",
+            "Accept": "application/json, text/event-stream",
+        }
+        if auth_token:
+            self._headers["Authorization"] = f"Bearer {auth_token}"
+        self._timeout_conn: aiohttp.ClientTimeout
+        self._timeout_exec: aiohttp.ClientTimeout
+        self.set_timeouts(timeout_connection, timeout_execution)
+        self._session = session
         self._session_id: str | None = None
-        self._id_counter = itertools.count(1)
+        self._initialized = False
+        self._supports_batch: bool | None = None
+        self._batch_window = batch_window
+        self._pending_calls: list[tuple[str, dict, asyncio.Future[dict]]] = []
+        self._flush_handle: asyncio.TimerHandle | None = None
+        self._flush_tasks: set[asyncio.Task[None]] = set()
+        self._id = 0
+        self._consecutive_failures = 0
+        self._circuit_open_until = 0.0
+        self._tools_cache_ttl = tools_cache_ttl
+        self._tools_cache: list[dict] | None = None
+        self._tools_cache_expires = 0.0
+
+    @property
+    def connected(self) -> bool:
+        """Return True once the MCP session has been initialized."""
+        return self._initialized
+
+    def set_timeouts(self, timeout_connection: int, timeout_execution: int) -> None:
+        """Update the request timeouts used by subsequent requests.
+
+        Timeouts bound connecting (including waiting for a pooled connection)
+        and each socket read rather than the whole request, so long SSE
+        responses that keep streaming are not cut off.
+        """
+        self._timeout_conn = aiohttp.ClientTimeout(
+            total=None,
+            connect=timeout_connection,
+            sock_connect=timeout_connection,
+            sock_read=timeout_connection,
+        )
+        self._timeout_exec = aiohttp.ClientTimeout(
+            total=None,
+            connect=timeout_connection,
+            sock_connect=timeout_connection,
+            sock_read=timeout_execution,
+        )
+
+    def set_batch_window(self, batch_window: float) -> None:
+        """Update the tool call batching window (0 disables batching)."""
+        self._batch_window = batch_window
 
     async def connect(self) -> None:
         """Connect to the gateway and initialize the MCP session."""
-        self._session = self._external_session or aiohttp.ClientSession()
-
         # Step 1: Send initialize request
-        result, headers = await self._raw_request(
+        self._id += 1
+        _, headers = await self._raw_request(
             {
                 "jsonrpc": "2.0",
                 "method": "initialize",
@@ -55,125 +151,348 @@ class StreamableHTTPTransport:
                         "version": MCP_CLIENT_VERSION,
                     },
                 },
-                "id": next(self._id_counter),
-            }
+                "id": self._id,
+            },
+            return_headers=True,
         )
 
-        self._session_id = headers.get("Mcp-Session-Id")
+        self._set_session_id(headers.get("Mcp-Session-Id"))
         _LOGGER.debug("MCP session initialized: %s", self._session_id)
 
         # Step 2: Send initialized notification
         await self._raw_request(
-            {"jsonrpc": "2.0", "method": "notifications/initialized"},
+            _INITIALIZED_BYTES,
             expect_response=False,
         )
+        self._initialized = True
 
     async def disconnect(self) -> None:
         """Disconnect from the gateway."""
-        if self._session and not self._session.closed and not self._external_session:
-            await self._session.close()
-        self._session = None
-        self._session_id = None
-
-    def _build_headers(self) -> dict[str, str]:
-        """Build request headers."""
-        headers = {
-            "Content-Type": "application/json",
-            "Accept": "application/json, text/event-stream",
-        }
-        if self._auth_token:
-            headers["Authorization"] = f"Bearer {self._auth_token}"
-        if self._session_id:
-            headers["Mcp-Session-Id"] = self._session_id
-        return headers
+        if self._flush_handle:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        for _, _, future in self._pending_calls:
+            if not future.done():
+                future.set_exception(MCPTransportError("Transport disconnected"))
+        self._pending_calls = []
+        self._set_session_id(None)
+        self._initialized = False
+        self._tools_cache = None
+
+    def _set_session_id(self, session_id: str | None) -> None:
+        """Store the MCP session id and keep the request headers in sync."""
+        self._session_id = session_id
+        if session_id:
+            self._headers["Mcp-Session-Id"] = session_id
+        else:
+            self._headers.pop("Mcp-Session-Id", None)
 
     async def _raw_request(
         self,
-        payload: dict,
+        payload: dict | list[dict] | bytes,
         *,
         expect_response: bool = True,
-        timeout_override: int | None = None,
-    ) -> tuple[dict, dict]:
-        """Make a request and parse SSE response."""
-        if not self._session:
-            raise RuntimeError("Not connected")
-
-        total = timeout_override or self._timeout_connection
-        timeout = aiohttp.ClientTimeout(total=total)
+        return_headers: bool = False,
+        is_tool_call: bool = False,
+    ) -> Any:
+        """Make a request to the gateway and return the JSON-RPC response.
+
+        Error responses to single requests raise MCPTransportError; batch
+        responses are returned as-is. With return_headers, a (response,
+        headers) tuple is returned instead. Tool calls use the execution
+        timeout, and their read timeouts do not count towards the circuit
+        breaker.
+
+        A request that hits a keep-alive connection the gateway has just
+        closed is re-sent once on a fresh connection. After repeated
+        failures, requests fail fast until the cooldown has passed.
+        """
+        if time.monotonic() < self._circuit_open_until:
+            raise MCPTransportError("MCP Gateway unavailable, retrying shortly")
+
+        data = payload if isinstance(payload, bytes) else json_bytes(payload)
+        timeout = self._timeout_exec if is_tool_call else self._timeout_conn
+        try:
+            try:
+                result, headers = await self._post(
+                    payload, data, expect_response, timeout
+                )
+            except (aiohttp.ServerDisconnectedError, aiohttp.ClientOSError) as err:
+                _LOGGER.debug("Retrying request on a fresh connection: %s", err)
+                result, headers = await self._post(
+                    payload, data, expect_response, timeout
+                )
+        except aiohttp.ClientResponseError as err:
+            if err.status >= 500:
+                self._record_failure()
+            else:
+                self._consecutive_failures = 0
+            raise
+        except (aiohttp.ClientConnectionError, TimeoutError) as err:
+            # A slow tool outliving the execution timeout says nothing about
+            # the gateway's health, so only other failures trip the breaker
+            if not (
+                is_tool_call
+                and isinstance(err, aiohttp.ServerTimeoutError)
+                and not isinstance(err, aiohttp.ConnectionTimeoutError)
+            ):
+                self._record_failure()
+            raise
+        self._consecutive_failures = 0
+
+        if not isinstance(payload, list):
+            self._raise_on_error(result)
+        return (result, headers) if return_headers else result
+
+    def _record_failure(self) -> None:
+        """Count a failed request and open the circuit at the threshold."""
+        self._consecutive_failures += 1
+        if self._consecutive_failures >= CIRCUIT_BREAKER_THRESHOLD:
+            _LOGGER.warning(
+                "MCP Gateway failed %d requests in a row, pausing for %.0fs",
+                self._consecutive_failures,
+                CIRCUIT_BREAKER_COOLDOWN,
+            )
+            self._circuit_open_until = time.monotonic() + CIRCUIT_BREAKER_COOLDOWN
+
+    async def _post(
+        self,
+        payload: dict | list[dict] | bytes,
+        data: bytes,
+        expect_response: bool,
+        timeout: aiohttp.ClientTimeout,
+    ) -> tuple[Any, Mapping[str, str]]:
+        """POST a serialized request and parse the JSON or SSE response."""
         async with self._session.post(
             self._url,
-            json=payload,
-            headers=self._build_headers(),
+            data=data,
+            headers=self._headers,
             timeout=timeout,
         ) as response:
-            response.raise_for_status()
+            if response.status >= 400:
+                response.raise_for_status()
 
             if not expect_response:
-                return {}, dict(response.headers)
+                return {}, response.headers
 
-            content_type = response.headers.get("Content-Type", "")
+            if response.content_type == "text/event-stream":
+                return (
+                    await self._parse_sse(response, batch=isinstance(payload, list)),
+                    response.headers,
+                )
 
-            if "text/event-stream" in content_type:
-                return await self._parse_sse(response), dict(response.headers)
+            return _decode_json(await response.read()), response.headers
+
+    @staticmethod
+    async def _iter_sse(response: aiohttp.ClientResponse) -> AsyncIterator[Any]:
+        """Yield the decoded data of each SSE event as soon as it arrives."""
+        buffer = bytearray()
+        start = 0
+        search_from = 0
+        async for chunk in response.content.iter_any():
+            if start:
+                # Drop consumed events before growing the buffer
+                del buffer[:start]
+                search_from -= start
+                start = 0
+            buffer.extend(chunk)
+            while match := _SSE_EVENT_END.search(buffer, search_from):
+                data = _sse_event_data(buffer[start : match.start()])
+                start = search_from = match.end()
+                if data is not None:
+                    yield _decode_json(data, "SSE data")
+            # An event boundary may straddle two chunks
+            search_from = max(len(buffer) - 3, start)
+        # Stream ended — flush any remaining buffered event
+        if (data := _sse_event_data(buffer[start:])) is not None:
+            yield _decode_json(data, "SSE data")
 
-            return await response.json(), dict(response.headers)
+    @classmethod
+    async def _parse_sse(
+        cls, response: aiohttp.ClientResponse, *, batch: bool = False
+    ) -> Any:
+        """Parse a Server-Sent Events response into the JSON-RPC response.
+
+        Server notifications and requests sent ahead of the response are
+        skipped. For a batch, responses may arrive in separate events and
+        are collected until the stream ends.
+        """
+        responses: list[dict] = []
+        async with aclosing(cls._iter_sse(response)) as messages:
+            async for message in messages:
+                if isinstance(message, list):
+                    return message
+                if not isinstance(message, dict) or not (
+                    "result" in message or "error" in message
+                ):
+                    _LOGGER.debug("Skipping SSE message: %s", message)
+                    continue
+                if not batch:
+                    return message
+                responses.append(message)
+        if responses:
+            return responses
+        raise MCPTransportError("SSE stream ended without a JSON-RPC response")
 
     @staticmethod
-    async def _parse_sse(response: aiohttp.ClientResponse) -> dict:
-        """Parse a Server-Sent Events response, returning the first event's data."""
-        data_lines: list[str] = []
-        async for line in response.content:
-            decoded = line.decode("utf-8").strip()
-            if decoded.startswith("data: "):
-                data_lines.append(decoded[6:])
-            elif not decoded and data_lines:
-                # Empty line signals end of an SSE event
-                try:
-                    return json.loads("\n".join(data_lines))
-                except json.JSONDecodeError as err:
-                    raise MCPTransportError(
-                        f"Invalid JSON in SSE data: {err}"
-                    ) from err
-        # Stream ended — flush any remaining buffered data lines
-        if data_lines:
-            try:
-                return json.loads("\n".join(data_lines))
-            except json.JSONDecodeError as err:
-                raise MCPTransportError(
-                    f"Invalid JSON in SSE data: {err}"
-                ) from err
-        raise MCPTransportError("SSE stream ended without any data")
-
-    async def _request(
-        self, payload: dict, *, timeout_override: int | None = None
-    ) -> dict:
-        """Make a request to the gateway and return the result."""
-        result, _ = await self._raw_request(
-            payload, timeout_override=timeout_override
-        )
-        if "error" in result:
-            err = result["error"]
+    def _raise_on_error(response: dict) -> None:
+        """Raise if a JSON-RPC response carries an error."""
+        if "error" in response:
+            err = response["error"]
             raise MCPTransportError(
                 f"JSON-RPC error {err.get('code')}: {err.get('message')}"
             )
-        return result
 
     async def list_tools(self) -> list[dict]:
         """List available tools from the gateway."""
-        result = await self._request(
-            {"jsonrpc": "2.0", "method": "tools/list", "id": next(self._id_counter)}
-        )
-        return result.get("result", {}).get("tools", [])
+        if (
+            self._tools_cache is not None
+            and time.monotonic() < self._tools_cache_expires
+        ):
+            return self._tools_cache
+        self._id += 1
+        try:
+            result = await self._raw_request(
+                b"%s%d}" % (_TOOLS_LIST_PREFIX, self._id)
+            )
+        except Exception:
+            self._tools_cache = None
+            raise
+        tools = result.get("result", {}).get("tools", [])
+        if self._tools_cache_ttl:
+            self._tools_cache = tools
+            self._tools_cache_expires = time.monotonic() + self._tools_cache_ttl
+        return tools
 
     async def call_tool(self, name: str, arguments: dict) -> dict:
-        """Call an MCP tool."""
-        result = await self._request(
-            {
-                "jsonrpc": "2.0",
-                "method": "tools/call",
-                "params": {"name": name, "arguments": arguments},
-                "id": next(self._id_counter),
-            },
-            timeout_override=self._timeout_execution,
+        """Call an MCP tool.
+
+        With a batch window set, calls made within the window are sent
+        together as one JSON-RPC batch.
+        """
+        if self._batch_window and self._supports_batch is not False:
+            return await self._queue_tool_call(name, arguments)
+        self._id += 1
+        result = await self._raw_request(
+            b'%s%s,"arguments":%s},"id":%d}'
+            % (_TOOLS_CALL_PREFIX, json_bytes(name), json_bytes(arguments), self._id),
+            is_tool_call=True,
         )
         return result.get("result", {})
+
+    def _tool_call_payload(self, name: str, arguments: dict) -> dict:
+        """Build a tools/call request."""
+        self._id += 1
+        return {
+            "jsonrpc": "2.0",
+            "method": "tools/call",
+            "params": {"name": name, "arguments": arguments},
+            "id": self._id,
+        }
+
+    async def call_tools_batch(self, calls: list[tuple[str, dict]]) -> list[dict]:
+        """Call several MCP tools in one JSON-RPC batch request.
+
+        Results are returned in the order of ``calls``. If the gateway does
+        not accept batches, the calls are sent concurrently instead and
+        batching is not attempted again for this transport.
+        """
+        return [
+            self._tool_result(response) for response in await self._send_batch(calls)
+        ]
+
+    async def _send_batch(
+        self, calls: list[tuple[str, dict]]
+    ) -> list[dict | BaseException]:
+        """Send tool calls and return each raw response or error, in order."""
+        payload = [
+            self._tool_call_payload(name, arguments) for name, arguments in calls
+        ]
+
+        if len(payload) > 1 and self._supports_batch is not False:
+            try:
+                responses = await self._raw_request(
+                    payload, is_tool_call=True
+                )
+            except aiohttp.ClientResponseError as err:
+                if err.status != 400:
+                    raise
+                responses = None
+
+            # A gateway without batch support may still answer 200 with a
+            # single id-less Invalid Request error, so a batch only counts
+            # as accepted once a response matches one of the calls
+            request_ids = {request["id"] for request in payload}
+            by_id = {
+                response["id"]: response
+                for response in (responses if isinstance(responses, list) else ())
+                if isinstance(response, dict) and response.get("id") in request_ids
+            }
+            if by_id:
+                self._supports_batch = True
+                return [
+                    by_id.get(request["id"])
+                    or MCPTransportError(
+                        f"No response for batched call to {request['params']['name']}"
+                    )
+                    for request in payload
+                ]
+            _LOGGER.debug("Gateway rejected JSON-RPC batch, sending calls singly")
+            self._supports_batch = False
+
+        return await asyncio.gather(
+            *(
+                self._raw_request(request, is_tool_call=True)
+                for request in payload
+            ),
+            return_exceptions=True,
+        )
+
+    def _tool_result(self, response: dict | BaseException) -> dict:
+        """Return the result of a tools/call response, raising on errors."""
+        if isinstance(response, BaseException):
+            raise response
+        self._raise_on_error(response)
+        return response.get("result", {})
+
+    async def _queue_tool_call(self, name: str, arguments: dict) -> dict:
+        """Queue a tool call for the next batch and wait for its result."""
+        loop = asyncio.get_running_loop()
+        future: asyncio.Future[dict] = loop.create_future()
+        self._pending_calls.append((name, arguments, future))
+        if len(self._pending_calls) >= MAX_BATCH_SIZE:
+            self._flush_tool_calls()
+        elif self._flush_handle is None:
+            self._flush_handle = loop.call_later(
+                self._batch_window, self._flush_tool_calls
+            )
+        return await future
+
+    def _flush_tool_calls(self) -> None:
+        """Send all queued tool calls as one batch."""
+        if self._flush_handle:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        pending, self._pending_calls = self._pending_calls, []
+        task = asyncio.get_running_loop().create_task(self._send_queued_calls(pending))
+        self._flush_tasks.add(task)
+        task.add_done_callback(self._flush_tasks.discard)
+
+    async def _send_queued_calls(
+        self, pending: list[tuple[str, dict, asyncio.Future[dict]]]
+    ) -> None:
+        """Send queued tool calls and resolve their futures."""
+        try:
+            responses = await self._send_batch(
+                [(name, arguments) for name, arguments, _ in pending]
+            )
+        except Exception as err:
+            responses = [err] * len(pending)
+
+        for (_, _, future), response in zip(pending, responses, strict=True):
+            if future.done():
+                continue
+            try:
+                future.set_result(self._tool_result(response))
+            except Exception as err:
+                future.set_exception(err)
@@ -0,0 +1,388 @@
+"""Tests for MCP Client coordinator."""
+
+from datetime import timedelta
+from typing import Any
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import aiohttp
+import pytest
+from homeassistant.core import HomeAssistant
+from homeassistant.exceptions import HomeAssistantError
+from homeassistant.helpers.json import json_bytes
+from homeassistant.util import dt as dt_util
+from pytest_homeassistant_custom_component.common import (
+    MockConfigEntry,
+    async_fire_time_changed,
+)
+
+from custom_components.mcp_client.const import (
+    CONF_ALLOWED_TOOLS,
+    CONF_AUTH_TOKEN,
+    CONF_BATCH_WINDOW,
+    CONF_GATEWAY_URL,
+    CONF_TIMEOUT_CONNECTION,
+    CONF_TIMEOUT_EXECUTION,
+    DOMAIN,
+)
+from custom_components.mcp_client.coordinator import (
+    MCPGatewayCoordinator,
+    tools_store,
+)
+
+TEST_TOOLS = [
+    {"name": "tool1", "description": "Test tool 1"},
+    {"name": "tool2", "description": "Test tool 2"},
+]
+
+
+def _mock_entry(hass: HomeAssistant, options: dict | None = None) -> MockConfigEntry:
+    """Create and register a mock MCP Client config entry."""
+    entry = MockConfigEntry(
+        domain=DOMAIN,
+        entry_id="test_entry",
+        data={
+            CONF_GATEWAY_URL: "http://localhost:8080/mcp",
+            CONF_AUTH_TOKEN: "secret",
+        },
+        options=options or {},
+    )
+    entry.add_to_hass(hass)
+    return entry
+
+
+def _mock_transport(tools: list[dict] | None = None) -> AsyncMock:
+    """Create a mock transport returning the given tools."""
+    transport = AsyncMock()
+    transport.connected = False
+    transport.set_timeouts = MagicMock()
+    transport.set_batch_window = MagicMock()
+    transport.list_tools = AsyncMock(return_value=tools or TEST_TOOLS)
+    return transport
+
+
+@pytest.mark.asyncio
+async def test_setup_loads_cached_tools(
+    hass: HomeAssistant, hass_storage: dict[str, Any]
+) -> None:
+    """Test the cached tool catalog is served on setup."""
+    entry = _mock_entry(hass, {CONF_ALLOWED_TOOLS: ["tool2"]})
+    coordinator = MCPGatewayCoordinator(hass, entry)
+    hass_storage[f"{DOMAIN}.test_entry.tools"] = {
+        "version": 1,
+        "data": {"key": coordinator._cache_key, "tools": TEST_TOOLS},
+    }
+
+    with patch(
+        "custom_components.mcp_client.coordinator.StreamableHTTPTransport",
+        return_value=_mock_transport(),
+    ):
+        await coordinator.async_setup()
+
+    assert [t["name"] for t in coordinator.tools] == ["tool2"]
+    assert coordinator.tools_loaded_from_cache
+
+
+@pytest.mark.asyncio
+async def test_connect_deferred_to_first_refresh(hass: HomeAssistant) -> None:
+    """Test setup leaves the MCP handshake to the first refresh."""
+    coordinator = MCPGatewayCoordinator(hass, _mock_entry(hass))
+    transport = _mock_transport()
+
+    with patch(
+        "custom_components.mcp_client.coordinator.StreamableHTTPTransport",
+        return_value=transport,
+    ):
+        await coordinator.async_setup()
+        transport.connect.assert_not_awaited()
+
+        await coordinator.async_refresh()
+
+    transport.connect.assert_awaited_once()
+    assert coordinator.last_update_success
+
+
+@pytest.mark.asyncio
+async def test_setup_ignores_stale_cache(
+    hass: HomeAssistant, hass_storage: dict[str, Any]
+) -> None:
+    """Test a cache written for another gateway or token is ignored."""
+    hass_storage[f"{DOMAIN}.test_entry.tools"] = {
+        "version": 1,
+        "data": {"key": "other-gateway", "tools": TEST_TOOLS},
+    }
+    coordinator = MCPGatewayCoordinator(hass, _mock_entry(hass))
+
+    with patch(
+        "custom_components.mcp_client.coordinator.StreamableHTTPTransport",
+        return_value=_mock_transport(),
+    ):
+        await coordinator.async_setup()
+
+    assert coordinator.tools == []
+    assert not coordinator.tools_loaded_from_cache
+
+
+@pytest.mark.asyncio
+async def test_refresh_persists_tools(
+    hass: HomeAssistant, hass_storage: dict[str, Any]
+) -> None:
+    """Test a successful refresh stores the unfiltered catalog."""
+    coordinator = MCPGatewayCoordinator(
+        hass, _mock_entry(hass, {CONF_ALLOWED_TOOLS: ["tool1"]})
+    )
+
+    with patch(
+        "custom_components.mcp_client.coordinator.StreamableHTTPTransport",
+        return_value=_mock_transport(),
+    ):
+        await coordinator.async_setup()
+        await coordinator.async_refresh()
+
+    async_fire_time_changed(hass, dt_util.utcnow() + timedelta(seconds=11))
+    await hass.async_block_till_done()
+
+    assert [t["name"] for t in coordinator.tools] == ["tool1"]
+    assert hass_storage[f"{DOMAIN}.test_entry.tools"]["data"]["tools"] == TEST_TOOLS
+
+
+@pytest.mark.asyncio
+async def test_disconnect_flushes_pending_save(
+    hass: HomeAssistant, hass_storage: dict[str, Any]
+) -> None:
+    """Test removing the cache after unload is not undone by a delayed write."""
+    coordinator = MCPGatewayCoordinator(hass, _mock_entry(hass))
+
+    with patch(
+        "custom_components.mcp_client.coordinator.StreamableHTTPTransport",
+        return_value=_mock_transport(),
+    ):
+        await coordinator.async_setup()
+        await coordinator.async_refresh()
+
+    await coordinator.async_disconnect()
+    assert hass_storage[f"{DOMAIN}.test_entry.tools"]["data"]["tools"] == TEST_TOOLS
+
+    await tools_store(hass, "test_entry").async_remove()
+    async_fire_time_changed(hass, dt_util.utcnow() + timedelta(seconds=11))
+    await hass.async_block_till_done()
+
+    assert f"{DOMAIN}.test_entry.tools" not in hass_storage
+
+
+@pytest.mark.asyncio
+async def test_options_update_applies_to_loaded_entry(hass: HomeAssistant) -> None:
+    """Test changed options re-filter the catalog and update timeouts."""
+    entry = _mock_entry(hass)
+    coordinator = MCPGatewayCoordinator(hass, entry)
+    transport = _mock_transport()
+
+    with patch(
+        "custom_components.mcp_client.coordinator.StreamableHTTPTransport",
+        return_value=transport,
+    ):
+        await coordinator.async_setup()
+        await coordinator.async_refresh()
+
+    assert len(coordinator.tools) == 2
+
+    hass.config_entries.async_update_entry(
+        entry,
+        options={
+            CONF_ALLOWED_TOOLS: ["tool1"],
+            CONF_TIMEOUT_CONNECTION: 20,
+            CONF_TIMEOUT_EXECUTION: 90,
+            CONF_BATCH_WINDOW: 5,
+        },
+    )
+    await hass.async_block_till_done()
+
+    assert [t["name"] for t in coordinator.tools] == ["tool1"]
+    transport.set_timeouts.assert_called_once_with(20, 90)
+    transport.set_batch_window.assert_called_once_with(0.005)
+
+
+@pytest.mark.asyncio
+async def test_refresh_retries_transient_errors(hass: HomeAssistant) -> None:
+    """Test connection errors are retried before the refresh fails."""
+    coordinator = MCPGatewayCoordinator(hass, _mock_entry(hass))
+    transport = _mock_transport()
+    transport.list_tools.side_effect = [aiohttp.ClientConnectionError(), TEST_TOOLS]
+
+    with (
+        patch(
+            "custom_components.mcp_client.coordinator.StreamableHTTPTransport",
+            return_value=transport,
+        ),
+        patch("custom_components.mcp_client.coordinator.RETRY_BACKOFF_BASE", 0),
+    ):
+        await coordinator.async_setup()
+        await coordinator.async_refresh()
+
+    assert coordinator.last_update_success
+    assert transport.list_tools.await_count == 2
+
+
+@pytest.mark.asyncio
+async def test_call_tool_does_not_retry_client_errors(hass: HomeAssistant) -> None:
+    """Test HTTP 4xx errors from the gateway are not retried."""
+    coordinator = MCPGatewayCoordinator(hass, _mock_entry(hass))
+    transport = _mock_transport()
+    transport.call_tool.side_effect = aiohttp.ClientResponseError(
+        MagicMock(), (), status=401
+    )
+
+    with (
+        patch(
+            "custom_components.mcp_client.coordinator.StreamableHTTPTransport",
+            return_value=transport,
+        ),
+        patch("custom_components.mcp_client.coordinator.RETRY_BACKOFF_BASE", 0),
+    ):
+        await coordinator.async_setup()
+        await coordinator.async_refresh()
+        with pytest.raises(HomeAssistantError):
+            await coordinator.async_call_tool("tool1", {})
+
+    assert transport.call_tool.await_count == 1
+
+
+@pytest.mark.parametrize(
+    ("error", "retried"),
+    [
+        (aiohttp.ClientConnectorError(MagicMock(), OSError(111, "refused")), True),
+        (aiohttp.ConnectionTimeoutError(), True),
+        (aiohttp.ServerDisconnectedError(), False),
+        (aiohttp.ClientOSError(104, "Connection reset by peer"), False),
+        (aiohttp.ServerTimeoutError(), False),
+        (TimeoutError(), False),
+    ],
+)
+@pytest.mark.asyncio
+async def test_call_tool_retry_by_aiohttp_error(
+    hass: HomeAssistant, error: Exception, retried: bool
+) -> None:
+    """Test only failures before the request left the client are retried."""
+    coordinator = MCPGatewayCoordinator(hass, _mock_entry(hass))
+    transport = _mock_transport()
+    transport.call_tool.side_effect = [error, {"content": []}]
+
+    with (
+        patch(
+            "custom_components.mcp_client.coordinator.StreamableHTTPTransport",
+            return_value=transport,
+        ),
+        patch("custom_components.mcp_client.coordinator.RETRY_BACKOFF_BASE", 0),
+    ):
+        await coordinator.async_setup()
+        await coordinator.async_refresh()
+        if retried:
+            assert await coordinator.async_call_tool("tool1", {}) == {"content": []}
+        else:
+            with pytest.raises(HomeAssistantError):
+                await coordinator.async_call_tool("tool1", {})
+
+    assert transport.call_tool.await_count == (2 if retried else 1)
+
+
+@pytest.mark.asyncio
+async def test_call_tool_dropped_connection_posts_twice(hass: HomeAssistant) -> None:
+    """Test a dropped tool call reaches the gateway at most twice in total."""
+    response = MagicMock()
+    response.status = 200
+    response.content_type = "application/json"
+    response.headers = {}
+    response.read = AsyncMock(
+        return_value=json_bytes({"jsonrpc": "2.0", "result": {"tools": TEST_TOOLS}})
+    )
+
+    def post(url: str, *, data: bytes, **kwargs: Any) -> MagicMock:
+        if b'"tools/call"' in data:
+            raise aiohttp.ServerDisconnectedError
+        context = MagicMock()
+        context.__aenter__ = AsyncMock(return_value=response)
+        context.__aexit__ = AsyncMock(return_value=None)
+        return context
+
+    session = MagicMock()
+    session.post.side_effect = post
+    coordinator = MCPGatewayCoordinator(hass, _mock_entry(hass))
+
+    with (
+        patch(
+            "custom_components.mcp_client.coordinator.async_get_clientsession",
+            return_value=session,
+        ),
+        patch("custom_components.mcp_client.coordinator.RETRY_BACKOFF_BASE", 0),
+    ):
+        await coordinator.async_setup()
+        await coordinator.async_refresh()
+        session.post.reset_mock()
+        with pytest.raises(HomeAssistantError):
+            await coordinator.async_call_tool("tool1", {})
+
+    assert session.post.call_count == 2
+
+
+@pytest.mark.asyncio
+async def test_call_tool_does_not_retry_socket_read_timeout(
+    hass: HomeAssistant,
+) -> None:
+    """Test a tool that outlives the execution timeout is not re-run."""
+    coordinator = MCPGatewayCoordinator(hass, _mock_entry(hass))
+    transport = _mock_transport()
+    transport.call_tool.side_effect = aiohttp.SocketTimeoutError()
+
+    with (
+        patch(
+            "custom_components.mcp_client.coordinator.StreamableHTTPTransport",
+            return_value=transport,
+        ),
+        patch("custom_components.mcp_client.coordinator.RETRY_BACKOFF_BASE", 0),
+    ):
+        await coordinator.async_setup()
+        await coordinator.async_refresh()
+        with pytest.raises(HomeAssistantError):
+            await coordinator.async_call_tool("tool1", {})
+
+    assert transport.call_tool.await_count == 1
+
+
+@pytest.mark.asyncio
+async def test_refresh_retries_read_timeouts(hass: HomeAssistant) -> None:
+    """Test tools/list is retried after a read timeout, being idempotent."""
+    coordinator = MCPGatewayCoordinator(hass, _mock_entry(hass))
+    transport = _mock_transport()
+    transport.list_tools.side_effect = [aiohttp.ServerTimeoutError(), TEST_TOOLS]
+
+    with (
+        patch(
+            "custom_components.mcp_client.coordinator.StreamableHTTPTransport",
+            return_value=transport,
+        ),
+        patch("custom_components.mcp_client.coordinator.RETRY_BACKOFF_BASE", 0),
+    ):
+        await coordinator.async_setup()
+        await coordinator.async_refresh()
+
+    assert coordinator.last_update_success
+    assert transport.list_tools.await_count == 2
+
+
+@pytest.mark.asyncio
+async def test_call_tool_rejects_disallowed_tool(hass: HomeAssistant) -> None:
+    """Test tools outside the filtered catalog are rejected locally."""
+    coordinator = MCPGatewayCoordinator(
+        hass, _mock_entry(hass, {CONF_ALLOWED_TOOLS: ["tool1"]})
+    )
+    transport = _mock_transport()
+
+    with patch(
+        "custom_components.mcp_client.coordinator.StreamableHTTPTransport",
+        return_value=transport,
+    ):
+        await coordinator.async_setup()
+        await coordinator.async_refresh()
+        with pytest.raises(HomeAssistantError, match="tool2"):
+            await coordinator.async_call_tool("tool2", {})
+
+    transport.call_tool.assert_not_awaited()
@@ -3,6 +3,7 @@
 from unittest.mock import AsyncMock, MagicMock, patch
 
 import pytest
+import voluptuous as vol
 from homeassistant.helpers import llm
 
 from custom_components.mcp_client.coordinator import MCPGatewayCoordinator
@@ -44,6 +45,28 @@ async def test_mcp_tools_api_get_instance() -> None:
     assert instance.tools[0].name == "test_tool"
 
 
+@pytest.mark.asyncio
+async def test_mcp_tools_api_reuses_tools() -> None:
+    """Test tools are only rebuilt when the coordinator catalog changes."""
+    mock_hass = MagicMock()
+    mock_entry = MagicMock()
+    mock_entry.entry_id = "test_entry"
+    mock_entry.title = "Test Gateway"
+
+    mock_coordinator = MagicMock()
+    mock_coordinator.tools = [{"name": "test_tool", "description": "A test tool"}]
+
+    api = MCPToolsAPI(mock_hass, mock_entry, mock_coordinator)
+
+    first = await api.async_get_api_instance(MagicMock())
+    second = await api.async_get_api_instance(MagicMock())
+    assert second.tools[0] is first.tools[0]
+
+    mock_coordinator.tools = [{"name": "other_tool", "description": "Another"}]
+    third = await api.async_get_api_instance(MagicMock())
+    assert third.tools[0].name == "other_tool"
+
+
 def test_mcp_tool_init() -> None:
     """Test MCPTool initialization."""
     mock_coordinator = MagicMock()
@@ -66,6 +89,11 @@ def test_mcp_tool_init() -> None:
     assert tool.description == "A test tool"
     assert tool._coordinator == mock_coordinator
 
+    keys = {str(key): key for key in tool.parameters.schema}
+    assert isinstance(keys["arg1"], vol.Required)
+    assert isinstance(keys["arg2"], vol.Optional)
+    assert keys["arg1"].description == "First argument"
+
 
 @pytest.mark.asyncio
 async def test_mcp_tool_async_call() -> None:
@@ -94,3 +122,42 @@ async def test_mcp_tool_async_call() -> None:
 
     assert result == {"result": "Result"}
     mock_coordinator.async_call_tool.assert_awaited_once_with("test_tool", {})
+
+
+def test_mcp_tool_schema_cached() -> None:
+    """Test tools with identical input schemas share one voluptuous schema."""
+    mock_coordinator = MagicMock()
+    input_schema = {
+        "type": "object",
+        "properties": {"arg1": {"type": "string"}},
+        "required": ["arg1"],
+    }
+
+    tool1 = MCPTool(
+        {"name": "tool1", "inputSchema": input_schema}, mock_coordinator
+    )
+    tool2 = MCPTool(
+        {"name": "tool2", "inputSchema": dict(input_schema)}, mock_coordinator
+    )
+
+    assert tool1.parameters is tool2.parameters
+    assert tool1.parameters({"arg1": "value"}) == {"arg1": "value"}
+
+
+def test_mcp_tool_extract_result() -> None:
+    """Test text content parts are joined and other results stringified."""
+    assert MCPTool._extract_result(
+        {
+            "content": [
+                {"type": "text", "text": "line 1"},
+                {"type": "image", "data": "..."},
+                {"type": "text", "text": "line 2"},
+            ]
+        }
+    ) == {"result": "line 1\nline 2"}
+    assert MCPTool._extract_result(
+        {"content": [{"type": "text", "text": ""}]}
+    ) == {"result": ""}
+    assert MCPTool._extract_result({"content": []}) == {
+        "result": "{'content': []}"
+    }
@@ -1,74 +1,455 @@
 """Tests for MCP Client transport layer."""
 
-from unittest.mock import AsyncMock, MagicMock, patch
+import asyncio
+from typing import Any
+from unittest.mock import AsyncMock, MagicMock, PropertyMock
 
 import aiohttp
 import pytest
+from homeassistant.helpers.json import json_bytes
+from homeassistant.util.json import json_loads
 
-from custom_components.mcp_client.transport import StreamableHTTPTransport
+from custom_components.mcp_client.transport import (
+    MCPTransportError,
+    StreamableHTTPTransport,
+)
+
+
+def _mock_sse_response(*chunks: bytes) -> MagicMock:
+    """Create a mock response streaming the given raw SSE chunks."""
+
+    async def iter_any():
+        for chunk in chunks:
+            yield chunk
+
+    response = MagicMock()
+    response.content.iter_any = iter_any
+    return response
+
+
+def _mock_session(json_response: dict | None = None) -> MagicMock:
+    """Create a mock aiohttp session whose POSTs return a JSON response."""
+    mock_response = MagicMock()
+    mock_response.status = 200
+    mock_response.content_type = "application/json"
+    mock_response.raise_for_status = MagicMock()
+    mock_response.headers = {"Mcp-Session-Id": "test-session"}
+    mock_response.read = AsyncMock(return_value=json_bytes(json_response or {}))
+
+    session = MagicMock()
+    session.post.return_value.__aenter__.return_value = mock_response
+    return session
 
 
 @pytest.mark.asyncio
 async def test_connect() -> None:
     """Test connection setup."""
-    transport = StreamableHTTPTransport(url="http://localhost:8080/mcp")
+    session = _mock_session({"jsonrpc": "2.0", "result": {}})
+    transport = StreamableHTTPTransport(
+        url="http://localhost:8080/mcp", session=session
+    )
 
     await transport.connect()
 
-    assert transport._session is not None
-    assert not transport._session.closed
+    assert transport.connected
+    assert transport._session_id == "test-session"
+    assert session.post.call_args.kwargs["headers"]["Mcp-Session-Id"] == "test-session"
+    assert session.post.call_count == 2
 
 
 @pytest.mark.asyncio
 async def test_disconnect() -> None:
-    """Test disconnection."""
-    transport = StreamableHTTPTransport(url="http://localhost:8080/mcp")
+    """Test disconnection leaves the shared session open."""
+    session = _mock_session({"jsonrpc": "2.0", "result": {}})
+    transport = StreamableHTTPTransport(
+        url="http://localhost:8080/mcp", session=session
+    )
 
     await transport.connect()
     await transport.disconnect()
 
-    assert transport._session is not None
-    assert transport._session.closed
+    assert not transport.connected
+    session.close.assert_not_called()
+    assert "Mcp-Session-Id" not in transport._headers
+
+
+@pytest.mark.asyncio
+async def test_connect_error_response() -> None:
+    """Test a JSON-RPC error to initialize fails the connection."""
+    session = _mock_session(
+        {"jsonrpc": "2.0", "id": 1, "error": {"code": -32602, "message": "bad"}}
+    )
+    transport = StreamableHTTPTransport(
+        url="http://localhost:8080/mcp", session=session
+    )
+
+    with pytest.raises(MCPTransportError, match="-32602"):
+        await transport.connect()
+
+    assert not transport.connected
 
 
 @pytest.mark.asyncio
 async def test_list_tools() -> None:
     """Test listing tools from gateway."""
     test_tools = [{"name": "test_tool", "description": "A test tool"}]
+    session = _mock_session({"jsonrpc": "2.0", "result": {"tools": test_tools}})
 
-    mock_response = MagicMock()
-    mock_response.raise_for_status = AsyncMock()
-    mock_response.json = AsyncMock(
-        return_value={"jsonrpc": "2.0", "result": {"tools": test_tools}}
+    transport = StreamableHTTPTransport(
+        url="http://localhost:8080/mcp", session=session
     )
+    await transport.connect()
+    tools = await transport.list_tools()
 
-    with patch("aiohttp.ClientSession.post") as mock_post:
-        mock_post.return_value.__aenter__.return_value = mock_response
+    assert len(tools) == 1
+    assert tools[0]["name"] == "test_tool"
+    assert json_loads(session.post.call_args.kwargs["data"]) == {
+        "jsonrpc": "2.0",
+        "method": "tools/list",
+        "id": 2,
+    }
 
-        transport = StreamableHTTPTransport(url="http://localhost:8080/mcp")
-        await transport.connect()
-        tools = await transport.list_tools()
 
-        assert len(tools) == 1
-        assert tools[0]["name"] == "test_tool"
+@pytest.mark.asyncio
+async def test_list_tools_cached() -> None:
+    """Test the tool list is reused within the TTL and dropped on disconnect."""
+    session = _mock_session({"jsonrpc": "2.0", "result": {"tools": []}})
+    transport = StreamableHTTPTransport(
+        url="http://localhost:8080/mcp", session=session
+    )
+    await transport.connect()
+
+    await transport.list_tools()
+    await transport.list_tools()
+    assert session.post.call_count == 3
+
+    await transport.disconnect()
+    await transport.list_tools()
+    assert session.post.call_count == 4
+
+
+@pytest.mark.asyncio
+async def test_list_tools_cache_disabled() -> None:
+    """Test a zero TTL always queries the gateway."""
+    session = _mock_session({"jsonrpc": "2.0", "result": {"tools": []}})
+    transport = StreamableHTTPTransport(
+        url="http://localhost:8080/mcp", session=session, tools_cache_ttl=0
+    )
+
+    await transport.list_tools()
+    await transport.list_tools()
+    assert session.post.call_count == 2
 
 
 @pytest.mark.asyncio
 async def test_call_tool() -> None:
     """Test calling a tool."""
     test_result = {"content": [{"type": "text", "text": "Tool executed successfully"}]}
+    session = _mock_session({"jsonrpc": "2.0", "result": test_result})
 
-    mock_response = MagicMock()
-    mock_response.raise_for_status = AsyncMock()
-    mock_response.json = AsyncMock(
-        return_value={"jsonrpc": "2.0", "result": test_result}
+    transport = StreamableHTTPTransport(
+        url="http://localhost:8080/mcp", session=session
     )
+    await transport.connect()
+    result = await transport.call_tool("test_tool", {"arg": "value"})
 
-    with patch("aiohttp.ClientSession.post") as mock_post:
-        mock_post.return_value.__aenter__.return_value = mock_response
+    assert result == test_result
+    assert json_loads(session.post.call_args.kwargs["data"]) == {
+        "jsonrpc": "2.0",
+        "method": "tools/call",
+        "params": {"name": "test_tool", "arguments": {"arg": "value"}},
+        "id": 2,
+    }
 
-        transport = StreamableHTTPTransport(url="http://localhost:8080/mcp")
-        await transport.connect()
-        result = await transport.call_tool("test_tool", {"arg": "value"})
 
-        assert result == test_result
+@pytest.mark.asyncio
+async def test_call_tool_uses_execution_read_timeout() -> None:
+    """Test tool calls bound socket reads rather than the whole response."""
+    session = _mock_session({"jsonrpc": "2.0", "result": {}})
+    transport = StreamableHTTPTransport(
+        url="http://localhost:8080/mcp",
+        session=session,
+        timeout_connection=10,
+        timeout_execution=120,
+    )
+    await transport.connect()
+    await transport.call_tool("test_tool", {})
+
+    timeout = session.post.call_args.kwargs["timeout"]
+    assert timeout.total is None
+    assert timeout.connect == 10
+    assert timeout.sock_connect == 10
+    assert timeout.sock_read == 120
+
+
+@pytest.mark.asyncio
+async def test_stale_connection_retried_once() -> None:
+    """Test a request on a connection the gateway closed is re-sent once."""
+    session = _mock_session({"jsonrpc": "2.0", "result": {"tools": []}})
+    transport = StreamableHTTPTransport(
+        url="http://localhost:8080/mcp", session=session
+    )
+    await transport.connect()
+
+    session.post.side_effect = [
+        aiohttp.ServerDisconnectedError(),
+        session.post.return_value,
+    ]
+    assert await transport.list_tools() == []
+    assert session.post.call_count == 4
+
+
+@pytest.mark.asyncio
+async def test_circuit_breaker_short_circuits_after_failures() -> None:
+    """Test repeated connection failures stop requests reaching the gateway."""
+    session = _mock_session()
+    session.post.side_effect = aiohttp.ClientConnectionError()
+    transport = StreamableHTTPTransport(
+        url="http://localhost:8080/mcp", session=session
+    )
+
+    for _ in range(5):
+        with pytest.raises(aiohttp.ClientConnectionError):
+            await transport.list_tools()
+    with pytest.raises(MCPTransportError):
+        await transport.list_tools()
+
+    assert session.post.call_count == 5
+
+
+@pytest.mark.asyncio
+async def test_tool_read_timeouts_do_not_open_circuit() -> None:
+    """Test slow tool calls timing out do not block other gateway requests."""
+    session = _mock_session({"jsonrpc": "2.0", "result": {"tools": []}})
+    transport = StreamableHTTPTransport(
+        url="http://localhost:8080/mcp", session=session
+    )
+    await transport.connect()
+
+    session.post.side_effect = aiohttp.SocketTimeoutError()
+    for _ in range(5):
+        with pytest.raises(aiohttp.SocketTimeoutError):
+            await transport.call_tool("slow_tool", {})
+
+    session.post.side_effect = None
+    assert await transport.list_tools() == []
+
+
+@pytest.mark.asyncio
+async def test_tool_read_timeouts_after_timeout_change_do_not_open_circuit() -> None:
+    """Test the breaker exclusion survives timeouts being updated mid-flight."""
+    session = _mock_session({"jsonrpc": "2.0", "result": {"tools": []}})
+    transport = StreamableHTTPTransport(
+        url="http://localhost:8080/mcp", session=session
+    )
+    await transport.connect()
+
+    def post(*args: Any, **kwargs: Any) -> MagicMock:
+        # Options change while the tool call is in flight
+        transport.set_timeouts(20, 90)
+        raise aiohttp.SocketTimeoutError
+
+    session.post.side_effect = post
+    for _ in range(5):
+        with pytest.raises(aiohttp.SocketTimeoutError):
+            await transport.call_tool("slow_tool", {})
+
+    session.post.side_effect = None
+    assert await transport.list_tools() == []
+
+
+@pytest.mark.asyncio
+async def test_call_tools_batch() -> None:
+    """Test batched tool calls are matched to their responses by id."""
+    session = _mock_session({"jsonrpc": "2.0", "result": {}})
+    transport = StreamableHTTPTransport(
+        url="http://localhost:8080/mcp", session=session
+    )
+    await transport.connect()
+
+    # initialize used id 1, so the batched calls are ids 2 and 3
+    session.post.return_value.__aenter__.return_value.read = AsyncMock(
+        return_value=json_bytes(
+            [
+                {"jsonrpc": "2.0", "id": 3, "result": {"content": ["second"]}},
+                {"jsonrpc": "2.0", "id": 2, "result": {"content": ["first"]}},
+            ]
+        )
+    )
+    results = await transport.call_tools_batch([("tool1", {}), ("tool2", {})])
+
+    assert results == [{"content": ["first"]}, {"content": ["second"]}]
+    assert b'"id":3' in session.post.call_args.kwargs["data"]
+
+
+@pytest.mark.asyncio
+async def test_call_tools_batch_fallback() -> None:
+    """Test gateways rejecting batches get concurrent single calls instead."""
+    session = _mock_session({"jsonrpc": "2.0", "result": {}})
+    transport = StreamableHTTPTransport(
+        url="http://localhost:8080/mcp", session=session
+    )
+    await transport.connect()
+
+    response = session.post.return_value.__aenter__.return_value
+    type(response).status = PropertyMock(side_effect=[400, 200, 200])
+    response.raise_for_status.side_effect = aiohttp.ClientResponseError(
+        MagicMock(), (), status=400
+    )
+    response.read = AsyncMock(
+        return_value=json_bytes({"jsonrpc": "2.0", "id": 0, "result": {"content": []}})
+    )
+    results = await transport.call_tools_batch([("tool1", {}), ("tool2", {})])
+
+    assert results == [{"content": []}, {"content": []}]
+    assert transport._supports_batch is False
+    assert session.post.call_count == 5
+
+
+@pytest.mark.asyncio
+async def test_call_tools_batch_fallback_sse() -> None:
+    """Test a batch rejected with an id-less SSE error falls back to single calls."""
+    session = _mock_session({"jsonrpc": "2.0", "result": {}})
+    transport = StreamableHTTPTransport(
+        url="http://localhost:8080/mcp", session=session
+    )
+    await transport.connect()
+
+    response = session.post.return_value.__aenter__.return_value
+    type(response).content_type = PropertyMock(
+        side_effect=["text/event-stream", "application/json", "application/json"]
+    )
+    response.content = _mock_sse_response(
+        b'data: {"jsonrpc":"2.0","id":null,'
+        b'"error":{"code":-32600,"message":"Invalid Request"}}\n\n'
+    ).content
+    response.read = AsyncMock(
+        return_value=json_bytes({"jsonrpc": "2.0", "id": 0, "result": {"content": []}})
+    )
+    results = await transport.call_tools_batch([("tool1", {}), ("tool2", {})])
+
+    assert results == [{"content": []}, {"content": []}]
+    assert transport._supports_batch is False
+    assert session.post.call_count == 5
+
+
+@pytest.mark.asyncio
+async def test_call_tool_coalesces_within_batch_window() -> None:
+    """Test concurrent tool calls within the batch window share one request."""
+    session = _mock_session({"jsonrpc": "2.0", "result": {}})
+    transport = StreamableHTTPTransport(
+        url="http://localhost:8080/mcp", session=session, batch_window=0.001
+    )
+    await transport.connect()
+
+    session.post.return_value.__aenter__.return_value.read = AsyncMock(
+        return_value=json_bytes(
+            [
+                {"jsonrpc": "2.0", "id": 2, "result": {"content": ["first"]}},
+                {"jsonrpc": "2.0", "id": 3, "error": {"code": -1, "message": "x"}},
+            ]
+        )
+    )
+    first, second = await asyncio.gather(
+        transport.call_tool("tool1", {}),
+        transport.call_tool("tool2", {}),
+        return_exceptions=True,
+    )
+
+    assert first == {"content": ["first"]}
+    assert isinstance(second, MCPTransportError)
+    assert session.post.call_count == 3
+
+
+@pytest.mark.asyncio
+async def test_call_tool_coalescing_falls_back_on_sse_rejection() -> None:
+    """Test coalesced calls recover when an SSE gateway rejects batches."""
+    session = _mock_session({"jsonrpc": "2.0", "result": {}})
+    transport = StreamableHTTPTransport(
+        url="http://localhost:8080/mcp", session=session, batch_window=0.001
+    )
+    await transport.connect()
+
+    response = session.post.return_value.__aenter__.return_value
+    type(response).content_type = PropertyMock(
+        side_effect=["text/event-stream"] + ["application/json"] * 3
+    )
+    response.content = _mock_sse_response(
+        b'data: {"jsonrpc":"2.0","id":null,'
+        b'"error":{"code":-32600,"message":"Invalid Request"}}\n\n'
+    ).content
+    response.read = AsyncMock(
+        return_value=json_bytes({"jsonrpc": "2.0", "id": 0, "result": {"content": []}})
+    )
+    results = await asyncio.gather(
+        transport.call_tool("tool1", {}),
+        transport.call_tool("tool2", {}),
+    )
+
+    assert results == [{"content": []}, {"content": []}]
+    assert transport._supports_batch is False
+
+    # Later calls are no longer queued for batching
+    assert await transport.call_tool("tool1", {}) == {"content": []}
+    assert not transport._pending_calls
+    assert session.post.call_count == 6
+
+
+@pytest.mark.asyncio
+async def test_parse_sse_split_chunks() -> None:
+    """Test SSE events are parsed when split across arbitrary chunks."""
+    response = _mock_sse_response(
+        b": keep-alive\r\n\r",
+        b"\nevent: message\r\ndata: {\"jsonrpc\": ",
+        b'"2.0", "result": {}}\r\n',
+        b"\r\n",
+    )
+
+    result = await StreamableHTTPTransport._parse_sse(response)
+
+    assert result == {"jsonrpc": "2.0", "result": {}}
+
+
+@pytest.mark.asyncio
+async def test_parse_sse_skips_notifications() -> None:
+    """Test server notifications ahead of the response are skipped."""
+    response = _mock_sse_response(
+        b'data: {"jsonrpc":"2.0","method":"notifications/progress"}\n\n',
+        b'data: {"jsonrpc":"2.0","id":2,"result":{"content":[]}}\n\n',
+    )
+
+    result = await StreamableHTTPTransport._parse_sse(response)
+
+    assert result == {"jsonrpc": "2.0", "id": 2, "result": {"content": []}}
+
+
+@pytest.mark.asyncio
+async def test_parse_sse_collects_batch_responses() -> None:
+    """Test batch responses sent as separate SSE events are collected."""
+    response = _mock_sse_response(
+        b'data: {"jsonrpc":"2.0","id":3,"result":{}}\n\n',
+        b'data: {"jsonrpc":"2.0","id":2,"result":{}}\n\n',
+    )
+
+    result = await StreamableHTTPTransport._parse_sse(response, batch=True)
+
+    assert [message["id"] for message in result] == [3, 2]
+
+
+@pytest.mark.asyncio
+async def test_parse_sse_multiline_data_at_eof() -> None:
+    """Test multi-line data is joined and flushed when the stream ends."""
+    response = _mock_sse_response(b'data: {"result":\ndata: {"tools": []}}')
+
+    result = await StreamableHTTPTransport._parse_sse(response)
+
+    assert result == {"result": {"tools": []}}
+
+
+@pytest.mark.asyncio
+async def test_parse_sse_invalid_json() -> None:
+    """Test malformed SSE data raises a transport error."""
+    response = _mock_sse_response(b"data: not json\n\n")
+
+    with pytest.raises(MCPTransportError):
+        await StreamableHTTPTransport._parse_sse(response)